@@ -1,11 +1,87 @@
 from __future__ import annotations
 
+import functools
 import re
 from dataclasses import dataclass
 from typing import Iterable
 
 
-@dataclass
+def _leading_digits(s: str) -> int:
+    """Return the number of decimal digits at the start of `s`."""
+    n = 0
+    while n < len(s) and s[n].isdecimal():
+        n += 1
+    return n
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_user_regex(pat: str) -> re.Pattern[str]:
+    """Compile a regex from an address, once per distinct pattern."""
+    return re.compile(pat)
+
+
+_REGEX_METACHARS = frozenset(r".^$*+?{}[]\|()")
+
+
+def _is_literal(pat: str) -> bool:
+    """Is `pat` a regex that only matches itself, all within one line?"""
+    return _REGEX_METACHARS.isdisjoint(pat) and len(pat.splitlines()) == 1
+
+
+def _parse_addr(expr: str) -> tuple[int | None, str | None, bool, int, str]:
+    """Parse an address from the start of `expr`.
+
+    Returns the Addr fields (number, regex, last, delta) as plain values, and
+    the rest of `expr`.
+    """
+    # Addresses are parsed by hand rather than with a regex: the first
+    # non-space character decides what kind of head the address has, then
+    # an optional delta follows.
+    number: int | None = None
+    regex: str | None = None
+    last = False
+    delta = 0
+    rest = expr.lstrip()
+    head = rest[:1]
+    if head == "/":
+        close = rest.find("/", 1)
+        if close == -1:
+            close = len(rest)
+            # Like a regex $, an unterminated regex stops before a final newline.
+            if close > 2 and rest.endswith("\n"):
+                close -= 1
+        if close > 1:
+            regex = rest[1:close]
+            rest = rest[close + 1 :]
+    elif head == "$":
+        last = True
+        rest = rest[1:]
+    elif head == ".":
+        rest = rest[1:]
+    elif ndigits := _leading_digits(rest):
+        number = int(rest[:ndigits])
+        rest = rest[ndigits:]
+
+    # The delta is either a signed number, or a run of all-plus or
+    # all-minus signs, possibly with spaces.
+    rest = rest.lstrip()
+    sign = rest[:1] if rest[:1] in ("+", "-") else ""
+    digits = rest[len(sign) :].lstrip()
+    if ndigits := _leading_digits(digits):
+        delta = int(sign + digits[:ndigits])
+        rest = digits[ndigits:]
+    else:
+        plus_len = len(rest) - len(rest.lstrip(" +-"))
+        plus = rest[:plus_len].replace(" ", "")
+        if plus:
+            if plus.count(plus[0]) != len(plus):
+                raise ValueError(f"Invalid address delta: {expr!r}")
+            delta = len(plus) * (1 if plus[0] == "+" else -1)
+            rest = rest[plus_len:]
+    return number, regex, last, delta, rest
+
+
+@dataclass(slots=True, frozen=True)
 class Addr:
     """An ed-like line address."""
 
@@ -15,52 +91,22 @@ class Addr:
     delta: int = 0
 
     @classmethod
+    @functools.lru_cache(maxsize=4096)
     def parse(cls, expr: str) -> tuple[Addr, str]:
-        m = re.match(
-            r"""(?x)
-            ^
-            \s*                         # optional whitespace
-            (?:
-                (?P<number>\d+)         # line number
-                |
-                (?P<regex>/[^/]+?(/|$)) # regex
-                |
-                (?P<last>\$)            # last line
-                |
-                \.                      # current line
-            )?
-            \s*                         # optional whitespace
-            (?:
-                (?P<delta>[+-]?\s*\d+)  # optional numeric delta
-                |
-                (?P<plus>[ +-]+)        # optional plus/minus delta
-            )?
-            """,
-            expr,
-        )
-        assert m is not None  # the pattern can match nothing, so it always matches
-        addr = cls()
-        if m["number"] is not None:
-            addr.number = int(m["number"])
-        elif m["regex"] is not None:
-            addr.regex = m["regex"].strip("/")
-        elif m["last"] is not None:
-            addr.last = True
-        if m["delta"] is not None:
-            addr.delta = int(m["delta"].replace(" ", ""))
-        elif m["plus"] is not None:
-            plus = m["plus"].replace(" ", "")
-            if len(set(plus)) != 1:
-                raise ValueError(f"Invalid address delta: {expr!r}")
-            addr.delta = len(plus) * (1 if plus[0] == "+" else -1)
-        return addr, expr[m.end() :]
+        number, regex, last, delta, rest = _parse_addr(expr)
+        return cls(number=number, regex=regex, last=last, delta=delta), rest
 
     def is_relative(self) -> bool:
         """Return True if this address is relative (no number, regex, or last)."""
         return self.number is None and self.regex is None and not self.last
 
 
-@dataclass
+# The separators between range addresses, and whether the second address is
+# relative to the start of the text (",") or to the first address (";").
+_SEPARATORS = {",": True, ";": False}
+
+
+@dataclass(slots=True, frozen=True)
 class Range:
     """An expression for a range of lines specified by one or two addresses."""
 
@@ -69,36 +115,43 @@ class Range:
     from0: bool = True
 
     @classmethod
+    @functools.lru_cache(maxsize=4096)
     def parse(cls, expr: str) -> Range:
         if expr == "%":
             expr = "1,$"
         start, rest = Addr.parse(expr)
-        r = Range(start=start)
         if not rest:
-            return r
-        if rest[0] not in ",;":
+            return cls(start=start)
+        from0 = _SEPARATORS.get(rest[0])
+        if from0 is None:
             raise ValueError(f"Invalid range: {expr!r}")
-        r.from0 = rest[0] == ","
-        r.end, rest = Addr.parse(rest[1:])
+        end, rest = Addr.parse(rest[1:])
         if rest:
             raise ValueError(f"Invalid range tail: {rest!r}")
-        return r
+        return cls(start=start, end=end, from0=from0)
 
 
 class EdText:
     """A string-like object that supports ed-like line addressing."""
 
-    def __init__(self, text: str, *, _lines: list[str] | None = None) -> None:
+    def __init__(self, text: str) -> None:
         self._text = text
-        if _lines is not None:
-            self._lines = _lines
-        else:
-            self._lines = text.splitlines(keepends=True)
+
+    # The text is only split into lines once lines are addressed.
+
+    @functools.cached_property
+    def _lines(self) -> list[str]:
+        """The lines of the text, with their line endings."""
+        return self._text.splitlines(keepends=True)
+
+    @functools.cached_property
+    def _nlines(self) -> int:
+        """The number of lines."""
+        return len(self._lines)
 
     @classmethod
     def from_lines(cls, lines: Iterable[str]) -> EdText:
-        _lines = list(lines)
-        return cls("".join(_lines), _lines=_lines)
+        return cls("".join(lines))
 
     def __str__(self) -> str:
         return self._text
@@ -107,9 +160,12 @@ class EdText:
         text = self._text
         if len(text) > 40:
             text = text[:37] + "..."
-        return f"EdText({text!r}, {len(self._lines)} lines)"
+        return f"EdText({text!r}, {self._nlines} lines)"
 
     def __eq__(self, other: object) -> bool:
+        # Comparing to a plain str is the most common case, so check it first.
+        if type(other) is str:
+            return self._text == other
         if isinstance(other, EdText):
             return self._text == other._text
         if isinstance(other, str):
@@ -124,73 +180,117 @@ class EdText:
         if addr.number is not None:
             res = addr.number + addr.delta
         elif addr.regex is not None:
-            for num, line in enumerate(self._lines[start:], start=start + 1):
-                if re.search(addr.regex, line):
-                    res = num + addr.delta
-                    break
-            else:
-                raise ValueError(f"Pattern not found: /{addr.regex}/")
+            res = self._find_line(addr.regex, start) + addr.delta
         elif addr.last:
-            res = len(self._lines) + addr.delta
+            res = self._nlines + addr.delta
         else:
             if start == 0:
                 start = 1
             res = start + addr.delta
-        if res < 1 or res > len(self._lines):
-            raise ValueError(f"Address {res} outside of range 1-{len(self._lines)}")
+        if res < 1 or res > self._nlines:
+            raise ValueError(f"Address {res} outside of range 1-{self._nlines}")
         return res
 
-    def _range_line_numbers(self, range_expr: str, start: int) -> Iterable[int]:
+    def _find_line(self, regex: str, start: int) -> int:
+        """Return the one-based index of the first line matching `regex`,
+        searching from the zero-based line index `start`.
+        """
+        if start >= self._nlines:
+            # Nothing to search, so don't let an invalid regex fail to compile.
+            raise ValueError(f"Pattern not found: /{regex}/")
+        lines = self._lines
+        if _is_literal(regex):
+            # Plain text can be found with a substring test, no regex needed.
+            for num in range(start, self._nlines):
+                if regex in lines[num]:
+                    return num + 1
+            raise ValueError(f"Pattern not found: /{regex}/")
+
+        # Real regexes are searched one line at a time: searching the whole
+        # text would let patterns that can match a line break backtrack across
+        # all of the remaining lines.  This loop can run over every line, so
+        # look up what it needs once.
+        search = _compile_user_regex(regex).search
+        for num in range(start, self._nlines):
+            if search(lines[num]):
+                return num + 1
+        raise ValueError(f"Pattern not found: /{regex}/")
+
+    def _range_slices(self, range_expr: str, start: int) -> Iterable[tuple[int, int]]:
         if range_expr[0] == "g":
             gr = Range.parse(range_expr[1:])
             if gr.start.regex is None or gr.start.delta or gr.end is not None:
                 raise ValueError(f"Invalid global range: {range_expr!r}")
+            search = _compile_user_regex(gr.start.regex).search
             yield from (
-                num
-                for num, line in enumerate(self._lines)
-                if re.search(gr.start.regex, line)
+                (num, num + 1) for num, line in enumerate(self._lines) if search(line)
             )
         else:
-            r = Range.parse(range_expr)
-            start_idx = self._resolve_addr(r.start, start=start)
-            if r.end is None:
-                end_idx = start_idx
-            else:
-                start = 1 if r.from0 else start_idx
-                if r.end.is_relative() and r.from0:
-                    raise ValueError(f"Invalid range: {range_expr!r}")
-                end_idx = self._resolve_addr(r.end, start=start)
-            if start_idx > end_idx:
-                raise ValueError(f"Invalid range: start {start_idx} > end {end_idx}")
-            yield from range(start_idx - 1, end_idx)
-
-    def _line_numbers(self, *range_exprs: str) -> list[int]:
-        """Get the list of zero-based line numbers for the given range expressions."""
-        numbers = []
+            yield self._plain_range_slice(range_expr, start)
+
+    def _plain_range_slice(self, range_expr: str, start: int) -> tuple[int, int]:
+        """Get the half-open (start, end) zero-based line numbers for a
+        non-global range expression.
+        """
+        r = Range.parse(range_expr)
+        start_idx = self._resolve_addr(r.start, start=start)
+        if r.end is None:
+            end_idx = start_idx
+        else:
+            start = 1 if r.from0 else start_idx
+            if r.end.is_relative() and r.from0:
+                raise ValueError(f"Invalid range: {range_expr!r}")
+            end_idx = self._resolve_addr(r.end, start=start)
+        if start_idx > end_idx:
+            raise ValueError(f"Invalid range: start {start_idx} > end {end_idx}")
+        return (start_idx - 1, end_idx)
+
+    def _line_slices(self, *range_exprs: str) -> list[tuple[int, int]]:
+        """Get the lines selected by the given range expressions, as a list of
+        half-open (start, end) runs of zero-based line numbers.
+        """
+        runs: list[tuple[int, int]] = []
         start = 0
         for range_expr in range_exprs:
-            numbers.extend(self._range_line_numbers(range_expr, start))
-            start = numbers[-1] + 1
-        return numbers
+            for lo, hi in self._range_slices(range_expr, start):
+                if runs and runs[-1][1] == lo:
+                    runs[-1] = (runs[-1][0], hi)
+                else:
+                    runs.append((lo, hi))
+            if runs:
+                start = runs[-1][1]
+        return runs
+
+    def _run_text(self, run: tuple[int, int]) -> str:
+        """Return the text of a half-open run of zero-based line numbers."""
+        return "".join(self._lines[run[0] : run[1]])
 
     def ranges(self, *range_exprs: str) -> EdText:
         """Make a new EdText with the lines selected by the given ranges."""
-        return EdText.from_lines(
-            self._lines[n] for n in self._line_numbers(*range_exprs)
-        )
+        return EdText("".join(map(self._run_text, self._line_slices(*range_exprs))))
 
     range = ranges
 
+    def _one_range(self, range_expr: str) -> EdText:
+        """Make a new EdText with the lines selected by one range."""
+        if range_expr[0] == "g":
+            return self.ranges(range_expr)
+        return EdText(self._run_text(self._plain_range_slice(range_expr, 0)))
+
     def __getitem__(self, key: str | tuple[str, ...]) -> EdText:
         if isinstance(key, str):
-            key = (key,)
+            return self._one_range(key)
         return self.ranges(*key)
 
     def sub(self, range: str, pattern: str, repl: str) -> EdText:
         """Return a new EdText with `pattern` replaced by `repl` on lines selected by `range`."""
-        sub_nums = set(self._line_numbers(range))
-        new_lines = (
-            (re.sub(pattern, repl, line) if num in sub_nums else line)
-            for num, line in enumerate(self._lines)
-        )
-        return EdText.from_lines(new_lines)
+        runs = self._line_slices(range)
+        pat = _compile_user_regex(pattern)
+        pieces = []
+        end = 0
+        for run in runs:
+            pieces.append(self._run_text((end, run[0])))
+            pieces.extend(pat.sub(repl, line) for line in self._lines[run[0] : run[1]])
+            end = run[1]
+        pieces.append(self._run_text((end, self._nlines)))
+        return EdText("".join(pieces))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import re
 from contextlib import nullcontext as produces
 
@@ -43,6 +44,8 @@ def test_eq():
         ("/pattern/", produces(Addr(regex="pattern"))),
         ("  /pattern/", produces(Addr(regex="pattern"))),
         ("/pattern", produces(Addr(regex="pattern"))),
+        ("/pattern\n", produces(Addr(regex="pattern"))),
+        ("/\n", produces(Addr(regex="\n"))),
         ("/pattern/+12", produces(Addr(regex="pattern", delta=12))),
         ("/pattern/ + 12", produces(Addr(regex="pattern", delta=12))),
         ("/pattern/+12--", produces(Addr(regex="pattern", delta=12))),
@@ -105,6 +108,29 @@ def test_parse_range(expr, result):
         assert Range.parse(expr) == expected
 
 
+@pytest.mark.parametrize(
+    "expr, result",
+    [
+        ("  /p/" + " + " * 1000, produces(Addr(regex="p", delta=1000))),
+        ("  /p/" + " - " * 1000, produces(Addr(regex="p", delta=-1000))),
+        (
+            "  /p/" + " + " * 1000 + "-",
+            raises(ValueError, match=r"Invalid address delta"),
+        ),
+    ],
+)
+def test_parse_long_plus_minus_delta(expr, result):
+    with result as expected:
+        assert Addr.parse(expr)[0] == expected
+
+
+def test_parse_is_cached():
+    assert Range.parse("/start/+1,$") is Range.parse("/start/+1,$")
+    addr, _ = Addr.parse("10")
+    with raises(dataclasses.FrozenInstanceError):
+        addr.number = 11  # ty: ignore
+
+
 @pytest.mark.parametrize(
     "range, result",
     [
@@ -124,6 +150,7 @@ def test_parse_range(expr, result):
         ("5;/line [456]/", produces("line 5\nline 6\n")),
         (" 5 ; /line [456]/ ", produces("line 5\nline 6\n")),
         ("$-2,$", produces("line 8\nline 9\nline 10\n")),
+        ("g/line [35]/", produces("line 3\nline 5\n")),
         (
             "/5/--,7",
             produces("line 3\nline 4\nline 5\nline 6\nline 7\n"),
@@ -147,6 +174,40 @@ def test_range(range, result):
         assert EdText(ten_lines)[range] == expected_text
 
 
+@pytest.mark.parametrize(
+    "text, range, result",
+    [
+        ("ab\ncd\n", r"/b\sc/", raises(ValueError, match=r"Pattern not found")),
+        ("ab\ncd\nb c\n", r"/b\sc/", produces("b c\n")),
+        ("ab\rcd\n", "/^c/", produces("cd\n")),
+        ("ab\ncd\n", "/^c/", produces("cd\n")),
+        ("ab\ncd\n", r"/\n$/", produces("ab\n")),
+        ("ab\ncd\n", r"/(?<!\n)c/", produces("cd\n")),
+        ("ab\x0bcd\ne", "/e\n", produces("e")),
+        ("ab\rcd\n", "/cd/", produces("cd\n")),
+        ("ab\r\ncd\r\nef\r\n", "/cd/", produces("cd\r\n")),
+        ("ab\r\ncd\r\nef\r\n", "/cd/;/ef/", produces("cd\r\nef\r\n")),
+        ("ab\x0bcd\x85ef\u2028gh\n", "/ef/;+", produces("ef\u2028gh\n")),
+        ("ab\rcd\n", "/b c/", raises(ValueError, match=r"Pattern not found")),
+        ("", "/+1/", raises(ValueError, match=r"Pattern not found: /\+1/")),
+        ("ab\n", "1;/+1/", raises(ValueError, match=r"Pattern not found: /\+1/")),
+        ("ab\ncd\n", "1;/+1/", raises(re.error, match=r"nothing to repeat")),
+    ],
+)
+def test_regex_lines(text, range, result):
+    with result as expected_text:
+        assert EdText(text)[range] == expected_text
+
+
+def test_regex_can_match_line_break_many_lines():
+    # This only checks the result: [^q]* can match a line break, but must not
+    # match across lines.  It doesn't detect slowness; a search of the whole
+    # text would backtrack over all the lines and make this test very slow,
+    # but it would still pass.
+    text = "abc def\n" * 50_000 + "q\n"
+    assert EdText(text)["/[^q]*q/"] == "q\n"
+
+
 @pytest.mark.parametrize(
     "ranges, result",
     [
@@ -210,6 +271,7 @@ def test_sub(pattern, repl, range, result):
         ("/line", r"l[aeiou]ne \d", r"lXne", "1,3", produces("lXne\nline 2\nline 3\n")),
         ("g/line", r"l[aeiou]ne \d", r"lXne", "1,3", produces("lXne\nlXne\nlXne\n")),
         ("g/line/", r"l[aeiou]ne \d", r"lXne", "1,3", produces("lXne\nlXne\nlXne\n")),
+        ("g/nope/", r"line", r"LINE", "1,2", produces("line 1\nline 2\n")),
         (
             "g23",
             r"x",